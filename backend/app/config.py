@@ -1,4 +1,5 @@
 import os
+from dataclasses import dataclass
 from pathlib import Path
 
 # Base paths
@@ -26,12 +27,39 @@ AVAILABLE_MODELS = {
     },
 }
 
+
+@dataclass(frozen=True)
+class ModelView:
+    """Static, read-only description of an available model."""
+
+    id: str
+    name: str
+    repo: str
+    description: str
+    recommended_steps: int
+    recommended_guidance: float
+    size_gb: float = 0
+    quantize: int = 4
+
+
+# AVAILABLE_MODELS baked into frozen views once at import time
+MODEL_VIEWS: dict[str, ModelView] = {
+    model_id: ModelView(**model_info) for model_id, model_info in AVAILABLE_MODELS.items()
+}
+
 # Default generation settings
 DEFAULT_WIDTH = 1024
 DEFAULT_HEIGHT = 1024
 DEFAULT_STEPS = 8
 DEFAULT_GUIDANCE = 0.0
 
+# PNG deflate level for saved images (1 = fastest, 9 = smallest)
+PNG_COMPRESS_LEVEL = int(os.environ.get("ZIMAGE_PNG_COMPRESS_LEVEL", "1"))
+
+# MLX Metal allocator limits in MB (0 leaves the MLX default)
+MLX_CACHE_LIMIT_MB = int(os.environ.get("ZIMAGE_MLX_CACHE_MB", "1024"))
+MLX_MEMORY_LIMIT_MB = int(os.environ.get("ZIMAGE_MLX_MEMORY_MB", "0"))
+
 # Device - MFLUX uses MLX which auto-detects Apple Silicon
 DEVICE = "mlx"
 
@@ -1,27 +1,32 @@
 import asyncio
 import base64
-import io
 import json
 import os
+import shutil
 import uuid
+import zlib
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 from pathlib import Path
 from typing import Optional
 
-from fastapi import FastAPI, HTTPException, WebSocket, WebSocketDisconnect, UploadFile, File, Form
+import msgpack
+import msgspec
+from fastapi import FastAPI, HTTPException, Request, WebSocket, UploadFile, File, Form
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel, Field
 from PIL import Image
 
 from .config import (
-    AVAILABLE_MODELS,
     DEFAULT_GUIDANCE,
     DEFAULT_HEIGHT,
     DEFAULT_STEPS,
     DEFAULT_WIDTH,
     DEVICE,
+    MODEL_VIEWS,
     OUTPUTS_DIR,
     UPLOADS_DIR,
 )
@@ -38,8 +43,23 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# WebSocket connections for real-time updates
-connected_clients: set[WebSocket] = set()
+# WebSocket connections for real-time updates, each with its own outgoing queue
+CLIENT_QUEUE_SIZE = 256
+HEARTBEAT_INTERVAL = 30
+connected_clients: dict[WebSocket, "ClientQueue"] = {}
+_heartbeat_task: Optional[asyncio.Task] = None
+
+# Image file I/O and base64 encoding, kept apart from the model manager's executor
+_encode_pool = ThreadPoolExecutor(max_workers=2)
+
+# WebSocket wire formats, negotiated through the handshake subprotocol
+WIRE_JSON = "json"
+WIRE_MSGPACK = "msgpack"
+
+# MessagePack frames carry a one-byte prefix saying whether they are compressed
+FRAME_MSGPACK = b"\x01"
+FRAME_MSGPACK_ZLIB = b"\x02"
+COMPRESS_THRESHOLD = 4 * 1024
 
 
 class GenerationRequest(BaseModel):
@@ -51,9 +71,10 @@ class GenerationRequest(BaseModel):
     guidance_scale: float = Field(default=DEFAULT_GUIDANCE, ge=0.0, le=20.0)
     seed: Optional[int] = None
     negative_prompt: Optional[str] = None
+    include_base64: bool = False
 
 
-class GenerationResponse(BaseModel):
+class GenerationResponse(msgspec.Struct, kw_only=True):
     image_id: str
     image_url: str
     image_base64: Optional[str] = None
@@ -65,42 +86,297 @@ class GenerationResponse(BaseModel):
     generation_time: float
 
 
-async def broadcast_message(message: dict):
-    """Broadcast a message to all connected WebSocket clients."""
+class ModelStatusView(msgspec.Struct):
+    state: str
+    progress: Optional[dict]
+    error: Optional[str]
+    is_current: bool
+
+
+# Static model fields, encoded once as the opening of each model's JSON object
+_MODEL_STATIC_JSON: dict[str, bytes] = {
+    model_id: msgspec.json.encode({
+        "id": view.id,
+        "name": view.name,
+        "description": view.description,
+        "recommended_steps": view.recommended_steps,
+        "recommended_guidance": view.recommended_guidance,
+        "size_gb": view.size_gb,
+    })[:-1] + b","
+    for model_id, view in MODEL_VIEWS.items()
+}
+
+
+# FastAPI can't document msgspec structs, so the generate endpoints declare their schema explicitly
+_GENERATION_RESPONSES = {
+    200: {
+        "description": "The generated image",
+        "content": {
+            "application/json": {
+                "schema": msgspec.json.schema_components(
+                    [GenerationResponse], ref_template="#/components/schemas/{name}"
+                )[1]["GenerationResponse"],
+            },
+        },
+    },
+}
+
+
+def _json_response(content) -> Response:
+    """Encode a response body with msgspec."""
+    return Response(content=msgspec.json.encode(content), media_type="application/json")
+
+
+def _persist_image(image_data: bytes, image_path: Path, include_base64: bool = False) -> Optional[str]:
+    """Save an encoded image and return its base64 if requested."""
+    # Write under a temporary name so the image only appears once it is complete
+    tmp_path = image_path.with_suffix(".tmp")
+    tmp_path.write_bytes(image_data)
+    os.replace(tmp_path, image_path)
+    _invalidate_images_cache()
+    return base64.b64encode(image_data).decode() if include_base64 else None
+
+
+def _store_upload(upload, upload_path: Path) -> tuple[int, int]:
+    """Stream an uploaded file to disk and return its dimensions.
+
+    Only the image header is parsed; pixel data is decoded later by MFLUX.
+    """
+    with open(upload_path, "wb") as out:
+        shutil.copyfileobj(upload, out, length=1 << 20)
+    with Image.open(upload_path) as im:
+        size = im.size
+        im.verify()
+    return size
+
+
+def _encode(message: dict, wire: str = WIRE_JSON) -> bytes:
+    """Encode a message for the given WebSocket wire format."""
+    if wire == WIRE_MSGPACK:
+        return msgpack.packb(message, use_bin_type=True, default=str)
+    return json.dumps(message, default=str).encode()
+
+
+def _encode_batch(parts: list[bytes], wire: str) -> bytes:
+    """Wrap already encoded messages into a single batch message."""
+    if wire == WIRE_MSGPACK:
+        packer = msgpack.Packer(use_bin_type=True)
+        return (
+            packer.pack_map_header(2)
+            + packer.pack("type") + packer.pack("batch")
+            + packer.pack("messages") + packer.pack_array_header(len(parts))
+            + b"".join(parts)
+        )
+    return b'{"type":"batch","messages":[' + b",".join(parts) + b"]}"
+
+
+def _frame_msgpack(data: bytes) -> bytes:
+    """Add the MessagePack framing prefix, compressing large payloads."""
+    if len(data) > COMPRESS_THRESHOLD:
+        return FRAME_MSGPACK_ZLIB + zlib.compress(data, 1)
+    return FRAME_MSGPACK + data
+
+
+def _wire_payload(data: bytes, wire: str) -> bytes:
+    """Turn an encoded message into the bytes sent in a WebSocket frame."""
+    return _frame_msgpack(data) if wire == WIRE_MSGPACK else data
+
+
+class Frame:
+    """A message that is encoded lazily, at most once per wire format.
+
+    The resulting bytes are shared by every client using that format.
+    """
+
+    __slots__ = ("message", "_encoded", "_payloads")
+
+    def __init__(self, message: dict):
+        self.message = message
+        self._encoded: dict[str, bytes] = {}
+        self._payloads: dict[str, bytes] = {}
+
+    def encode(self, wire: str) -> bytes:
+        """Get the encoded message, for embedding in a batch."""
+        data = self._encoded.get(wire)
+        if data is None:
+            data = _encode(self.message, wire)
+            self._encoded[wire] = data
+        return data
+
+    def payload(self, wire: str) -> bytes:
+        """Get the bytes to send when this message goes out on its own."""
+        data = self._payloads.get(wire)
+        if data is None:
+            data = _wire_payload(self.encode(wire), wire)
+            self._payloads[wire] = data
+        return data
+
+
+# Model status frames, reused until the status version changes
+_status_frame_cache: dict[str, tuple[int, Frame]] = {}
+
+
+def _progress_message(progress) -> dict:
+    """Get the wire fields of a download progress, computing the derived values."""
+    message = msgspec.structs.asdict(progress)
+    del message["start_time"], message["last_tick_time"], message["complete"]
+    message["speed"] = progress.speed
+    message["eta"] = progress.eta
+    message["percent"] = progress.percent
+    return message
+
+
+def _status_frame(model_id: str, status) -> Frame:
+    """Get the model_status frame for a model."""
+    version = status.status_version
+    cached = _status_frame_cache.get(model_id)
+    if cached is not None and cached[0] == version:
+        return cached[1]
+
+    frame = Frame({
+        "type": "model_status",
+        "model_id": model_id,
+        "state": status.state.value,
+        "progress": _progress_message(status.progress),
+        "error": status.error,
+    })
+    _status_frame_cache[model_id] = (version, frame)
+    return frame
+
+
+def _status_view(model_id: str) -> dict:
+    """Get the cached status fields of a model for API responses."""
+    status = model_manager.get_model_status(model_id)
+    if status is None:
+        return {"state": "unknown", "progress": None, "error": None}
+    return _status_frame(model_id, status).message
+
+
+def _encode_model(model_id: str) -> bytes:
+    """Encode the API view of a model by splicing its status into the static fields."""
+    view = _status_view(model_id)
+    status_json = msgspec.json.encode(ModelStatusView(
+        state=view["state"],
+        progress=view["progress"],
+        error=view["error"],
+        is_current=model_manager.current_model == model_id,
+    ))
+    return _MODEL_STATIC_JSON[model_id] + status_json[1:]
+
+
+class ClientQueue:
+    """Outgoing messages for one WebSocket client.
+
+    A keyed message replaces any queued message with the same key and moves
+    to the tail, so a slow client holds at most one pending update per key
+    and messages keep their order. When the queue is full the oldest message
+    is dropped.
+    """
+
+    def __init__(self, maxsize: int = CLIENT_QUEUE_SIZE):
+        self.maxsize = maxsize
+        self._items: deque[tuple[Optional[tuple], Optional[Frame]]] = deque()
+        self._keyed: dict[tuple, Frame] = {}
+        self._ready = asyncio.Event()
+
+    def put(self, frame: Frame, key: Optional[tuple] = None):
+        """Queue a frame without blocking."""
+        if key is not None and key in self._keyed:
+            # Drop the older copy's slot so the newest one is queued last
+            self._items.remove((key, None))
+            del self._keyed[key]
+
+        if len(self._items) >= self.maxsize:
+            self._pop()
+        if key is None:
+            self._items.append((None, frame))
+        else:
+            self._keyed[key] = frame
+            self._items.append((key, None))
+        self._ready.set()
+
+    def _pop(self) -> Frame:
+        key, frame = self._items.popleft()
+        return frame if key is None else self._keyed.pop(key)
+
+    async def get_all(self) -> list[Frame]:
+        """Wait for at least one frame, then take everything queued."""
+        while not self._items:
+            self._ready.clear()
+            await self._ready.wait()
+        return [self._pop() for _ in range(len(self._items))]
+
+
+async def broadcast_message(message, key: Optional[tuple] = None):
+    """Broadcast a message to all connected WebSocket clients.
+
+    The message may be a dict or a Frame. Queued messages sharing the
+    same key are coalesced so only the latest one is sent.
+    """
     if not connected_clients:
         return
 
-    message_str = json.dumps(message, default=str)
-    disconnected = set()
+    frame = message if isinstance(message, Frame) else Frame(message)
+    for queue in connected_clients.values():
+        queue.put(frame, key)
 
-    for client in connected_clients:
+
+async def _client_writer(websocket: WebSocket, queue: ClientQueue, wire: str):
+    """Drain a client's queue and send everything that is ready as one frame."""
+    while True:
+        frames = await queue.get_all()
+        if len(frames) == 1:
+            payload = frames[0].payload(wire)
+        else:
+            parts = [frame.encode(wire) for frame in frames]
+            payload = _wire_payload(_encode_batch(parts, wire), wire)
         try:
-            await client.send_text(message_str)
+            await websocket.send_bytes(payload)
         except Exception:
-            disconnected.add(client)
+            # Client went away
+            return
+
+
+def _decode(data, wire: str):
+    """Decode an inbound message, returning None if it is malformed."""
+    try:
+        if isinstance(data, bytes) and wire == WIRE_MSGPACK:
+            message = msgpack.unpackb(data, raw=False)
+        else:
+            message = json.loads(data)
+    except Exception:
+        return None
+    return message if isinstance(message, dict) else None
+
 
-    for client in disconnected:
-        connected_clients.discard(client)
+async def _client_reader(websocket: WebSocket, queue: ClientQueue, wire: str):
+    """Handle inbound messages from a client."""
+    while True:
+        event = await websocket.receive()
+        if event["type"] == "websocket.disconnect":
+            return
+
+        # Text frames are JSON; binary frames are MessagePack for msgpack clients
+        data = event.get("bytes") if event.get("text") is None else event["text"]
+        message = _decode(data, wire) if data is not None else None
+        if message is None:
+            continue
+
+        # Handle ping
+        if message.get("type") == "ping":
+            queue.put(Frame({"type": "pong"}))
+
+
+async def _heartbeat_tick():
+    """Send a heartbeat to every connected client from a single timer."""
+    while True:
+        await asyncio.sleep(HEARTBEAT_INTERVAL)
+        await broadcast_message({"type": "heartbeat"}, key=("heartbeat",))
 
 
 async def progress_callback(model_id: str, status):
     """Async callback for model download/load progress."""
-    await broadcast_message({
-        "type": "model_status",
-        "model_id": model_id,
-        "state": status.state.value,
-        "progress": {
-            "total_size": status.progress.total_size,
-            "downloaded_size": status.progress.downloaded_size,
-            "current_file": status.progress.current_file,
-            "files_completed": status.progress.files_completed,
-            "total_files": status.progress.total_files,
-            "speed": status.progress.speed,
-            "eta": status.progress.eta,
-            "percent": status.progress.percent,
-        },
-        "error": status.error,
-    })
+    await broadcast_message(_status_frame(model_id, status), key=("model_status", model_id))
 
 
 @app.on_event("startup")
@@ -109,6 +385,10 @@ async def startup_event():
     loop = asyncio.get_event_loop()
     model_manager.set_event_loop(loop)
     model_manager.add_async_callback(progress_callback)
+    model_manager.probe_cache()
+
+    global _heartbeat_task
+    _heartbeat_task = asyncio.create_task(_heartbeat_tick())
 
 
 @app.get("/")
@@ -136,71 +416,48 @@ async def get_system_info():
     }
 
 
+# Last /api/models body, keyed by the status versions and current model
+_models_response_cache: Optional[tuple[tuple, bytes]] = None
+
+
 @app.get("/api/models")
-async def get_models():
-    """Get list of available models and their status."""
-    models = []
-    for model_id, model_info in AVAILABLE_MODELS.items():
-        status = model_manager.get_model_status(model_id)
-        models.append({
-            "id": model_id,
-            "name": model_info["name"],
-            "description": model_info["description"],
-            "recommended_steps": model_info["recommended_steps"],
-            "recommended_guidance": model_info["recommended_guidance"],
-            "size_gb": model_info.get("size_gb", 0),
-            "state": status.state.value if status else "unknown",
-            "progress": {
-                "total_size": status.progress.total_size if status else 0,
-                "downloaded_size": status.progress.downloaded_size if status else 0,
-                "current_file": status.progress.current_file if status else "",
-                "files_completed": status.progress.files_completed if status else 0,
-                "total_files": status.progress.total_files if status else 0,
-                "speed": status.progress.speed if status else 0,
-                "eta": status.progress.eta if status else 0,
-                "percent": status.progress.percent if status else 0,
-            } if status else None,
-            "error": status.error if status else None,
-            "is_current": model_manager.current_model == model_id,
-        })
-    return {"models": models}
+async def get_models(refresh: bool = False):
+    """Get list of available models and their status.
+
+    Pass refresh=true to rescan the Hugging Face cache first.
+    """
+    if refresh:
+        loop = asyncio.get_event_loop()
+        await loop.run_in_executor(None, model_manager.refresh_cache)
+
+    global _models_response_cache
+
+    # Every status change bumps a version, so the encoded body is reused until one does
+    cache_key = (
+        tuple(status.status_version for status in model_manager.get_all_status().values()),
+        model_manager.current_model,
+    )
+    if _models_response_cache is not None and _models_response_cache[0] == cache_key:
+        return Response(content=_models_response_cache[1], media_type="application/json")
+
+    content = b'{"models":[' + b",".join(_encode_model(model_id) for model_id in MODEL_VIEWS) + b"]}"
+    _models_response_cache = (cache_key, content)
+    return Response(content=content, media_type="application/json")
 
 
 @app.get("/api/models/{model_id}")
 async def get_model(model_id: str):
     """Get status of a specific model."""
-    if model_id not in AVAILABLE_MODELS:
+    if model_id not in MODEL_VIEWS:
         raise HTTPException(status_code=404, detail="Model not found")
 
-    model_info = AVAILABLE_MODELS[model_id]
-    status = model_manager.get_model_status(model_id)
-
-    return {
-        "id": model_id,
-        "name": model_info["name"],
-        "description": model_info["description"],
-        "recommended_steps": model_info["recommended_steps"],
-        "recommended_guidance": model_info["recommended_guidance"],
-        "state": status.state.value if status else "unknown",
-        "progress": {
-            "total_size": status.progress.total_size if status else 0,
-            "downloaded_size": status.progress.downloaded_size if status else 0,
-            "current_file": status.progress.current_file if status else "",
-            "files_completed": status.progress.files_completed if status else 0,
-            "total_files": status.progress.total_files if status else 0,
-            "speed": status.progress.speed if status else 0,
-            "eta": status.progress.eta if status else 0,
-            "percent": status.progress.percent if status else 0,
-        } if status else None,
-        "error": status.error if status else None,
-        "is_current": model_manager.current_model == model_id,
-    }
+    return Response(content=_encode_model(model_id), media_type="application/json")
 
 
 @app.post("/api/models/{model_id}/download")
 async def download_model(model_id: str):
     """Start downloading a model."""
-    if model_id not in AVAILABLE_MODELS:
+    if model_id not in MODEL_VIEWS:
         raise HTTPException(status_code=404, detail="Model not found")
 
     status = model_manager.get_model_status(model_id)
@@ -216,11 +473,11 @@ async def download_model(model_id: str):
 @app.post("/api/models/{model_id}/load")
 async def load_model(model_id: str):
     """Load a model into memory."""
-    if model_id not in AVAILABLE_MODELS:
+    if model_id not in MODEL_VIEWS:
         raise HTTPException(status_code=404, detail="Model not found")
 
     status = model_manager.get_model_status(model_id)
-    if status and status.state == ModelState.LOADING:
+    if status and status.state in (ModelState.LOADING, ModelState.DOWNLOADING):
         return {"message": "Model is already loading", "model_id": model_id}
 
     if status and status.state == ModelState.READY:
@@ -235,7 +492,7 @@ async def load_model(model_id: str):
 @app.post("/api/models/{model_id}/unload")
 async def unload_model(model_id: str):
     """Unload a model from memory."""
-    if model_id not in AVAILABLE_MODELS:
+    if model_id not in MODEL_VIEWS:
         raise HTTPException(status_code=404, detail="Model not found")
 
     model_manager.unload_model(model_id)
@@ -243,7 +500,7 @@ async def unload_model(model_id: str):
     return {"message": "Model unloaded", "model_id": model_id}
 
 
-@app.post("/api/generate", response_model=GenerationResponse)
+@app.post("/api/generate", responses=_GENERATION_RESPONSES)
 async def generate_image(request: GenerationRequest):
     """Generate an image from a prompt."""
     # Check if model is ready
@@ -288,7 +545,7 @@ async def generate_image(request: GenerationRequest):
 
         # Generate image using MFLUX
         loop = asyncio.get_event_loop()
-        image, seed = await loop.run_in_executor(
+        image_data, seed = await loop.run_in_executor(
             None,
             lambda: model_manager.generate_image(
                 model_id=request.model_id,
@@ -307,13 +564,11 @@ async def generate_image(request: GenerationRequest):
         image_id = str(uuid.uuid4())
         image_filename = f"{image_id}.png"
         image_path = OUTPUTS_DIR / image_filename
-        image.save(str(image_path))
 
-        # Convert to base64
-        buffer = io.BytesIO()
-        image.save(buffer, format="PNG")
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        # Save and optionally convert to base64 off the event loop
+        image_base64 = await loop.run_in_executor(
+            _encode_pool, _persist_image, image_data, image_path, request.include_base64
+        )
 
         response = GenerationResponse(
             image_id=image_id,
@@ -335,7 +590,7 @@ async def generate_image(request: GenerationRequest):
             "generation_time": generation_time,
         })
 
-        return response
+        return _json_response(response)
 
     except Exception as e:
         import traceback
@@ -347,7 +602,7 @@ async def generate_image(request: GenerationRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@app.post("/api/generate/img2img")
+@app.post("/api/generate/img2img", responses=_GENERATION_RESPONSES)
 async def generate_img2img(
     prompt: str = Form(...),
     image: UploadFile = File(...),
@@ -355,6 +610,7 @@ async def generate_img2img(
     num_inference_steps: int = Form(default=DEFAULT_STEPS),
     image_strength: float = Form(default=0.7),
     seed: Optional[int] = Form(default=None),
+    include_base64: bool = False,
 ):
     """Generate an image from a reference image and prompt."""
     # Check if model is ready
@@ -386,15 +642,14 @@ async def generate_img2img(
     upload_path = UPLOADS_DIR / f"{upload_id}.png"
 
     try:
-        # Read and save uploaded image
-        contents = await image.read()
-        pil_image = Image.open(io.BytesIO(contents))
-        pil_image.save(str(upload_path))
-
-        # Get dimensions from uploaded image
-        width, height = pil_image.size
+        # Stream the upload to disk and get its dimensions
+        loop = asyncio.get_event_loop()
+        width, height = await loop.run_in_executor(
+            _encode_pool, _store_upload, image.file, upload_path
+        )
 
     except Exception as e:
+        upload_path.unlink(missing_ok=True)
         raise HTTPException(status_code=400, detail=f"Invalid image: {str(e)}")
 
     # Broadcast generation start
@@ -410,7 +665,7 @@ async def generate_img2img(
 
         # Generate image using MFLUX with reference image
         loop = asyncio.get_event_loop()
-        result_image, result_seed = await loop.run_in_executor(
+        image_data, result_seed = await loop.run_in_executor(
             None,
             lambda: model_manager.generate_image(
                 model_id=model_id,
@@ -431,13 +686,11 @@ async def generate_img2img(
         image_id = str(uuid.uuid4())
         image_filename = f"{image_id}.png"
         output_path = OUTPUTS_DIR / image_filename
-        result_image.save(str(output_path))
 
-        # Convert to base64
-        buffer = io.BytesIO()
-        result_image.save(buffer, format="PNG")
-        buffer.seek(0)
-        image_base64 = base64.b64encode(buffer.getvalue()).decode()
+        # Save and optionally convert to base64 off the event loop
+        image_base64 = await loop.run_in_executor(
+            _encode_pool, _persist_image, image_data, output_path, include_base64
+        )
 
         # Clean up uploaded file
         upload_path.unlink(missing_ok=True)
@@ -462,7 +715,7 @@ async def generate_img2img(
             "generation_time": generation_time,
         })
 
-        return response
+        return _json_response(response)
 
     except Exception as e:
         import traceback
@@ -477,21 +730,54 @@ async def generate_img2img(
 
 
 @app.get("/api/images/{image_id}")
-async def get_image(image_id: str):
+async def get_image(image_id: str, request: Request):
     """Get a generated image."""
     image_path = OUTPUTS_DIR / f"{image_id}.png"
     if not image_path.exists():
         raise HTTPException(status_code=404, detail="Image not found")
-    return FileResponse(image_path, media_type="image/png")
+
+    # Image ids are never reused, so the id is a strong ETag and the content can be cached forever
+    headers = {
+        "ETag": f'"{image_id}"',
+        "Cache-Control": "public, max-age=31536000, immutable",
+    }
+    # If-None-Match uses weak comparison, and "*" matches any existing file
+    if_none_match = request.headers.get("if-none-match", "")
+    tags = {tag.strip().removeprefix("W/") for tag in if_none_match.split(",")}
+    if "*" in tags or headers["ETag"] in tags:
+        return Response(status_code=304, headers=headers)
+    return FileResponse(image_path, media_type="image/png", headers=headers)
+
+
+# Last image listing, keyed by the mtime of the outputs directory
+_images_cache: Optional[tuple[int, bytes]] = None
+
+
+def _invalidate_images_cache():
+    """Drop the cached listing after the app adds or removes an image."""
+    global _images_cache
+    _images_cache = None
 
 
 @app.get("/api/images")
 async def list_images():
     """List all generated images."""
+    global _images_cache
+
+    # The app invalidates the listing itself; the directory mtime catches outside changes
+    cache_key = OUTPUTS_DIR.stat().st_mtime_ns
+    if _images_cache is not None and _images_cache[0] == cache_key:
+        return Response(content=_images_cache[1], media_type="application/json")
+
+    with os.scandir(OUTPUTS_DIR) as it:
+        entries = [(entry.name, entry.stat()) for entry in it if entry.name.endswith(".png")]
+
+    # Sort by creation time, newest first
+    entries.sort(key=lambda entry: entry[1].st_ctime, reverse=True)
+
     images = []
-    for image_path in OUTPUTS_DIR.glob("*.png"):
-        image_id = image_path.stem
-        stat = image_path.stat()
+    for name, stat in entries:
+        image_id = name[:-len(".png")]
         images.append({
             "id": image_id,
             "url": f"/api/images/{image_id}",
@@ -499,9 +785,9 @@ async def list_images():
             "size": stat.st_size,
         })
 
-    # Sort by creation time, newest first
-    images.sort(key=lambda x: x["created_at"], reverse=True)
-    return {"images": images}
+    content = msgspec.json.encode({"images": images})
+    _images_cache = (cache_key, content)
+    return Response(content=content, media_type="application/json")
 
 
 @app.delete("/api/images/{image_id}")
@@ -511,56 +797,46 @@ async def delete_image(image_id: str):
     if not image_path.exists():
         raise HTTPException(status_code=404, detail="Image not found")
     image_path.unlink()
+    _invalidate_images_cache()
     return {"message": "Image deleted", "image_id": image_id}
 
 
 @app.websocket("/ws")
 async def websocket_endpoint(websocket: WebSocket):
     """WebSocket endpoint for real-time updates."""
-    await websocket.accept()
-    connected_clients.add(websocket)
+    # Clients that offer the msgpack subprotocol get binary MessagePack frames
+    wire = WIRE_MSGPACK if WIRE_MSGPACK in websocket.scope.get("subprotocols", []) else WIRE_JSON
+    await websocket.accept(subprotocol=WIRE_MSGPACK if wire == WIRE_MSGPACK else None)
+    queue = ClientQueue()
+    connected_clients[websocket] = queue
+
+    # Send initial state
+    models_status = []
+    for model_id in MODEL_VIEWS:
+        view = _status_view(model_id)
+        models_status.append({
+            "model_id": model_id,
+            "state": view["state"],
+            "progress": view["progress"],
+        })
+
+    queue.put(Frame({
+        "type": "initial_state",
+        "models": models_status,
+        "current_model": model_manager.current_model,
+    }))
 
+    # Reader handles pings, writer drains the queue; either ending closes the connection
+    reader = asyncio.create_task(_client_reader(websocket, queue, wire))
+    writer = asyncio.create_task(_client_writer(websocket, queue, wire))
     try:
-        # Send initial state
-        models_status = []
-        for model_id, model_info in AVAILABLE_MODELS.items():
-            status = model_manager.get_model_status(model_id)
-            models_status.append({
-                "model_id": model_id,
-                "state": status.state.value if status else "unknown",
-                "progress": {
-                    "total_size": status.progress.total_size if status else 0,
-                    "downloaded_size": status.progress.downloaded_size if status else 0,
-                    "files_completed": status.progress.files_completed if status else 0,
-                    "total_files": status.progress.total_files if status else 0,
-                    "percent": status.progress.percent if status else 0,
-                } if status else None,
-            })
-
-        await websocket.send_text(json.dumps({
-            "type": "initial_state",
-            "models": models_status,
-            "current_model": model_manager.current_model,
-        }))
-
-        # Keep connection alive and handle messages
-        while True:
-            try:
-                data = await asyncio.wait_for(websocket.receive_text(), timeout=30)
-                message = json.loads(data)
-
-                # Handle ping
-                if message.get("type") == "ping":
-                    await websocket.send_text(json.dumps({"type": "pong"}))
-
-            except asyncio.TimeoutError:
-                # Send heartbeat
-                await websocket.send_text(json.dumps({"type": "heartbeat"}))
-
-    except WebSocketDisconnect:
-        pass
+        done, _ = await asyncio.wait({reader, writer}, return_when=asyncio.FIRST_COMPLETED)
+        for task in done:
+            task.result()
     finally:
-        connected_clients.discard(websocket)
+        connected_clients.pop(websocket, None)
+        reader.cancel()
+        writer.cancel()
 
 
 # Serve static files for frontend (production)
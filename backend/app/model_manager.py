@@ -1,13 +1,33 @@
 import asyncio
+import os
 import threading
 import time
-from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
 from typing import Callable, Optional
-from concurrent.futures import ThreadPoolExecutor
+from concurrent.futures import Future, ThreadPoolExecutor
 
-from .config import AVAILABLE_MODELS, MODELS_DIR
+import msgspec
+
+from .config import MODEL_VIEWS, MODELS_DIR, ModelView
+from .worker import PipelineWorker, WorkerDiedError
+
+# How often the HF cache is polled while a worker downloads a model, and how many
+# polls without new bytes mean the download is done and the model is loading
+DOWNLOAD_POLL_INTERVAL = 0.5
+DOWNLOAD_IDLE_POLLS = 3
+
+# Progress updates that stay within the same whole percent and file are sent at most this often
+MIN_NOTIFY_INTERVAL = 0.1
+
+
+def _dir_size(path: Path) -> int:
+    """Total size of the files directly inside a directory."""
+    try:
+        with os.scandir(path) as it:
+            return sum(entry.stat().st_size for entry in it if entry.is_file())
+    except OSError:
+        return 0
 
 
 class ModelState(str, Enum):
@@ -19,55 +39,122 @@ class ModelState(str, Enum):
     ERROR = "error"
 
 
-@dataclass
-class DownloadProgress:
+class DownloadProgress(msgspec.Struct):
+    """Raw download counters; percent, speed and eta are derived when read."""
+
     total_size: int = 0
     downloaded_size: int = 0
     current_file: str = ""
     files_completed: int = 0
     total_files: int = 0
-    speed: float = 0.0
-    eta: float = 0.0
-    percent: float = 0.0
-
-
-@dataclass
-class ModelStatus:
+    start_time: float = 0.0
+    last_tick_time: float = 0.0
+    complete: bool = False
+
+    def advance(self, downloaded_size: int):
+        """Record the downloaded byte count at the current time."""
+        now = time.monotonic()
+        if not self.start_time:
+            self.start_time = now
+        self.downloaded_size = downloaded_size
+        self.last_tick_time = now
+
+    @property
+    def percent(self) -> float:
+        if self.complete:
+            return 100.0
+        if not self.total_size:
+            return 0.0
+        return min(100.0, 100.0 * self.downloaded_size / self.total_size)
+
+    @property
+    def speed(self) -> float:
+        elapsed = self.last_tick_time - self.start_time
+        return self.downloaded_size / elapsed if elapsed > 0 else 0.0
+
+    @property
+    def eta(self) -> float:
+        speed = self.speed
+        remaining = self.total_size - self.downloaded_size
+        return remaining / speed if speed > 0 and remaining > 0 else 0.0
+
+
+class ModelStatus(msgspec.Struct):
     model_id: str
     state: ModelState = ModelState.NOT_DOWNLOADED
-    progress: DownloadProgress = field(default_factory=DownloadProgress)
+    progress: DownloadProgress = msgspec.field(default_factory=DownloadProgress)
     error: Optional[str] = None
+    status_version: int = 0
 
 
 class ModelManager:
     def __init__(self):
         self.models: dict[str, ModelStatus] = {}
-        self.pipelines: dict[str, any] = {}
+        self.pipelines: dict[str, PipelineWorker] = {}
         self.current_model: Optional[str] = None
         self._async_callbacks: list[Callable] = []
         self._lock = threading.Lock()
         self._loop: Optional[asyncio.AbstractEventLoop] = None
         self._executor = ThreadPoolExecutor(max_workers=2)
+        # Worker stops still in progress, so a reload can wait for the old process to exit
+        self._stopping: dict[str, Future] = {}
+        # (state, whole percent, current_file, monotonic time) of the last notification per model
+        self._last_notified: dict[str, tuple[ModelState, int, str, float]] = {}
+        # Models with a trailing notification scheduled for skipped updates
+        self._trailing_notify: set[str] = set()
         self._init_models()
 
     def _init_models(self):
-        """Initialize model status for all available models."""
-        for model_id in AVAILABLE_MODELS:
-            # MFLUX models are cached by huggingface_hub
-            # Check if the model is already cached
-            state = ModelState.NOT_DOWNLOADED
-            try:
-                from huggingface_hub import scan_cache_dir
-                cache_info = scan_cache_dir()
-                model_info = AVAILABLE_MODELS[model_id]
-                repo_name = model_info["repo"]
-                for repo in cache_info.repos:
-                    if repo.repo_id == repo_name:
-                        state = ModelState.DOWNLOADED
-                        break
-            except Exception:
-                pass
-            self.models[model_id] = ModelStatus(model_id=model_id, state=state)
+        """Initialize model status for all available models.
+
+        The HF cache is not touched here; probe_cache() fills in the
+        downloaded state once the app has started.
+        """
+        for model_id in MODEL_VIEWS:
+            self.models[model_id] = ModelStatus(model_id=model_id)
+
+    @staticmethod
+    def _repo_cache_dir(repo_id: str) -> Path:
+        """Get the HF cache directory of a repo."""
+        from huggingface_hub.constants import HF_HUB_CACHE
+
+        return Path(HF_HUB_CACHE) / f"models--{repo_id.replace('/', '--')}"
+
+    @classmethod
+    def _is_repo_cached(cls, repo_id: str) -> bool:
+        """Check whether a repo has a snapshot in the HF cache without scanning it."""
+        try:
+            return any((cls._repo_cache_dir(repo_id) / "snapshots").iterdir())
+        except Exception:
+            return False
+
+    def _apply_cache_state(self, model_id: str, cached: bool):
+        """Move a model between not downloaded and downloaded based on the cache."""
+        with self._lock:
+            status = self.models[model_id]
+            if cached and status.state == ModelState.NOT_DOWNLOADED:
+                status.state = ModelState.DOWNLOADED
+            elif not cached and status.state == ModelState.DOWNLOADED:
+                status.state = ModelState.NOT_DOWNLOADED
+            else:
+                return
+        self._notify_progress(model_id)
+
+    def probe_cache(self):
+        """Mark models whose repo is already in the HF cache as downloaded."""
+        # MFLUX models are cached by huggingface_hub
+        for model_id, model_info in MODEL_VIEWS.items():
+            self._apply_cache_state(model_id, self._is_repo_cached(model_info.repo))
+
+    def refresh_cache(self):
+        """Rescan the whole HF cache and update the downloaded state of all models."""
+        try:
+            from huggingface_hub import scan_cache_dir
+            cached_repos = {repo.repo_id for repo in scan_cache_dir().repos}
+        except Exception:
+            return
+        for model_id, model_info in MODEL_VIEWS.items():
+            self._apply_cache_state(model_id, model_info.repo in cached_repos)
 
     def set_event_loop(self, loop: asyncio.AbstractEventLoop):
         """Set the event loop for async callbacks."""
@@ -77,12 +164,44 @@ class ModelManager:
         """Add an async callback for progress updates."""
         self._async_callbacks.append(callback)
 
-    def _notify_progress(self, model_id: str):
+    def _notify_progress(self, model_id: str, force: bool = False):
         """Notify all callbacks about progress update."""
         status = self.get_model_status(model_id)
         if status is None:
             return
 
+        # Bump the version so cached encodings of this status are invalidated,
+        # but only notify on state changes or meaningful progress
+        now = time.monotonic()
+        with self._lock:
+            status.status_version += 1
+            state, percent, current_file, last_time = self._last_notified.get(
+                model_id, (None, -1, "", 0.0)
+            )
+            whole_percent = int(status.progress.percent)
+            skip = (
+                not force
+                and status.state == state
+                and status.progress.current_file == current_file
+                and whole_percent == percent
+                and now - last_time < MIN_NOTIFY_INTERVAL
+            )
+            if skip:
+                schedule_trailing = model_id not in self._trailing_notify
+                self._trailing_notify.add(model_id)
+            else:
+                self._last_notified[model_id] = (
+                    status.state, whole_percent, status.progress.current_file, now
+                )
+
+        if skip:
+            # Make sure the latest value still goes out once the interval has passed
+            if schedule_trailing and self._loop and self._loop.is_running():
+                self._loop.call_soon_threadsafe(
+                    self._loop.call_later, MIN_NOTIFY_INTERVAL, self._flush_progress, model_id
+                )
+            return
+
         if self._loop and self._async_callbacks:
             for callback in self._async_callbacks:
                 try:
@@ -94,6 +213,12 @@ class ModelManager:
                 except Exception as e:
                     print(f"Async callback error: {e}")
 
+    def _flush_progress(self, model_id: str):
+        """Send the trailing notification for updates skipped by _notify_progress."""
+        with self._lock:
+            self._trailing_notify.discard(model_id)
+        self._notify_progress(model_id, force=True)
+
     def get_model_status(self, model_id: str) -> Optional[ModelStatus]:
         """Get status of a specific model."""
         return self.models.get(model_id)
@@ -109,51 +234,59 @@ class ModelManager:
 
     async def download_model(self, model_id: str) -> bool:
         """Download a model - MFLUX handles this automatically on first load."""
-        if model_id not in AVAILABLE_MODELS:
+        if model_id not in MODEL_VIEWS:
             return False
 
         # For MFLUX, downloading happens during loading
         # We just mark it as ready to load
         with self._lock:
             self.models[model_id].state = ModelState.DOWNLOADED
-            self.models[model_id].progress.percent = 100.0
+            self.models[model_id].progress.complete = True
         self._notify_progress(model_id)
         return True
 
     async def load_model(self, model_id: str) -> bool:
         """Load a model into memory using MFLUX."""
-        if model_id not in AVAILABLE_MODELS:
+        if model_id not in MODEL_VIEWS:
             return False
 
         # Already loaded
         if model_id in self.pipelines:
-            self.current_model = model_id
             with self._lock:
+                self.current_model = model_id
                 self.models[model_id].state = ModelState.READY
             self._notify_progress(model_id)
             return True
 
+        model_info = MODEL_VIEWS[model_id]
+
+        # The worker downloads uncached models first; watch the cache to report it
+        cached = self._is_repo_cached(model_info.repo)
         with self._lock:
-            self.models[model_id].state = ModelState.LOADING
+            self.models[model_id].state = ModelState.LOADING if cached else ModelState.DOWNLOADING
         self._notify_progress(model_id)
+        watcher = None if cached else asyncio.create_task(self._watch_download(model_id, model_info))
 
         try:
-            model_info = AVAILABLE_MODELS[model_id]
-
             # Run in thread pool to avoid blocking
             loop = asyncio.get_event_loop()
             self._loop = loop
 
+            # Don't start a second copy while the previous worker is still exiting
+            stopping = self._stopping.get(model_id)
+            if stopping is not None:
+                await asyncio.wait([asyncio.wrap_future(stopping)])
+
             pipeline = await loop.run_in_executor(
                 self._executor,
                 lambda: self._load_mflux_pipeline(model_info)
             )
 
-            self.pipelines[model_id] = pipeline
-            self.current_model = model_id
-
             with self._lock:
+                self.pipelines[model_id] = pipeline
+                self.current_model = model_id
                 self.models[model_id].state = ModelState.READY
+                self.models[model_id].progress.complete = True
             self._notify_progress(model_id)
             return True
 
@@ -166,35 +299,63 @@ class ModelManager:
             self._notify_progress(model_id)
             return False
 
-    def _load_mflux_pipeline(self, model_info: dict):
-        """Load the MFLUX Z-Image Turbo pipeline."""
-        from mflux.models.z_image.variants.turbo.z_image_turbo import ZImageTurbo
+        finally:
+            if watcher is not None:
+                watcher.cancel()
 
-        quantize = model_info.get("quantize", 4)
-        print(f"[Z-Image] Loading Z-Image Turbo with {quantize}-bit quantization...")
-
-        # Load the model with quantization
-        pipeline = ZImageTurbo(
-            quantize=quantize,
-        )
+    async def _watch_download(self, model_id: str, model_info: ModelView):
+        """Report bytes landing in the HF cache while the worker downloads a model."""
+        blobs_dir = self._repo_cache_dir(model_info.repo) / "blobs"
+        status = self.models[model_id]
+        with self._lock:
+            status.progress = DownloadProgress(total_size=int(model_info.size_gb * 1024 ** 3))
+
+        loop = asyncio.get_event_loop()
+        idle_polls = 0
+        while True:
+            await asyncio.sleep(DOWNLOAD_POLL_INTERVAL)
+            # Includes the .incomplete files of downloads in progress
+            size = await loop.run_in_executor(None, _dir_size, blobs_dir)
+            with self._lock:
+                if size > status.progress.downloaded_size:
+                    status.progress.advance(size)
+                    idle_polls = 0
+                elif status.progress.downloaded_size:
+                    idle_polls += 1
+                if idle_polls >= DOWNLOAD_IDLE_POLLS and status.state == ModelState.DOWNLOADING:
+                    status.state = ModelState.LOADING
+            self._notify_progress(model_id)
 
-        print(f"[Z-Image] Z-Image Turbo loaded successfully")
-        return pipeline
+    def _load_mflux_pipeline(self, model_info: ModelView) -> PipelineWorker:
+        """Start a worker process running the MFLUX Z-Image Turbo pipeline."""
+        worker = PipelineWorker(model_info)
+        worker.start()
+        return worker
 
     def unload_model(self, model_id: str):
         """Unload a model from memory."""
-        if model_id in self.pipelines:
-            del self.pipelines[model_id]
+        with self._lock:
+            worker = self.pipelines.pop(model_id, None)
+            if worker is None:
+                return
             if self.current_model == model_id:
                 self.current_model = None
+            self.models[model_id].state = ModelState.DOWNLOADED
+        self._notify_progress(model_id)
 
-            with self._lock:
-                self.models[model_id].state = ModelState.DOWNLOADED
-            self._notify_progress(model_id)
+        # Stopping the worker process returns all of its Metal memory to the OS.
+        # It waits for any in-flight generation, so a reload waits on it in turn.
+        future = self._executor.submit(worker.stop)
+        self._stopping[model_id] = future
+        future.add_done_callback(lambda f: self._stop_done(model_id, f))
 
-            # Force garbage collection
-            import gc
-            gc.collect()
+    def _stop_done(self, model_id: str, future: Future):
+        """Forget a finished worker stop and report it if it failed."""
+        if self._stopping.get(model_id) is future:
+            del self._stopping[model_id]
+        error = future.exception()
+        if error is not None:
+            print(f"[Z-Image] Failed to stop worker for {model_id}: {error}")
 
     def get_pipeline(self, model_id: str):
         """Get a loaded pipeline."""
@@ -202,9 +363,12 @@ class ModelManager:
 
     def generate_image(self, model_id: str, prompt: str, width: int, height: int,
                        steps: int, guidance: float, seed: Optional[int] = None,
-                       image_path: Optional[str] = None, image_strength: Optional[float] = None):
+                       image_path: Optional[str] = None, image_strength: Optional[float] = None
+                       ) -> tuple[bytes, int]:
         """Generate an image using MFLUX Z-Image Turbo.
 
+        Returns the image encoded as PNG together with the seed used.
+
         Args:
             model_id: ID of the model to use
             prompt: Text prompt for generation
@@ -229,19 +393,36 @@ class ModelManager:
         else:
             print(f"[Z-Image] Generating image: {prompt[:50]}... (seed={seed})")
 
-        # Generate image - returns a GeneratedImage object
-        result = pipeline.generate_image(
-            seed=seed,
-            prompt=prompt,
-            num_inference_steps=steps,
-            height=height,
-            width=width,
-            image_path=image_path,
-            image_strength=image_strength,
-        )
-
-        # Return the PIL image from the GeneratedImage wrapper
-        return result.image, seed
+        # Generate image in the worker process
+        try:
+            image_data = pipeline.generate(
+                seed=seed,
+                prompt=prompt,
+                num_inference_steps=steps,
+                height=height,
+                width=width,
+                image_path=image_path,
+                image_strength=image_strength,
+            )
+        except WorkerDiedError as e:
+            self._handle_worker_death(model_id, pipeline, str(e))
+            raise
+
+        return image_data, seed
+
+    def _handle_worker_death(self, model_id: str, worker: PipelineWorker, error: str):
+        """Drop a worker whose process died and mark its model as errored."""
+        with self._lock:
+            # The model may have been unloaded or reloaded meanwhile
+            if self.pipelines.get(model_id) is not worker:
+                return
+            self.pipelines.pop(model_id, None)
+            if self.current_model == model_id:
+                self.current_model = None
+            self.models[model_id].state = ModelState.ERROR
+            self.models[model_id].error = error
+        self._notify_progress(model_id)
+        worker.stop()
 
 
 # Global model manager instance
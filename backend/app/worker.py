@@ -0,0 +1,171 @@
+import io
+import multiprocessing
+import threading
+from typing import Optional
+
+from .config import MLX_CACHE_LIMIT_MB, MLX_MEMORY_LIMIT_MB, PNG_COMPRESS_LEVEL, ModelView
+
+
+def _mlx_memory_api():
+    """Get the MLX module exposing the allocator functions.
+
+    Newer MLX versions have them on mlx.core, older ones on mlx.core.metal.
+    """
+    import mlx.core as mx
+
+    return mx if hasattr(mx, "set_cache_limit") else mx.metal
+
+
+def configure_mlx_memory():
+    """Bound the MLX buffer cache so freed buffers are returned between generations."""
+    try:
+        api = _mlx_memory_api()
+        if MLX_CACHE_LIMIT_MB > 0:
+            api.set_cache_limit(MLX_CACHE_LIMIT_MB * 1024 * 1024)
+        if MLX_MEMORY_LIMIT_MB > 0:
+            api.set_memory_limit(MLX_MEMORY_LIMIT_MB * 1024 * 1024)
+    except Exception as e:
+        print(f"[Z-Image] Could not configure MLX memory limits: {e}")
+
+
+def clear_mlx_cache():
+    """Release buffers held in the MLX cache."""
+    try:
+        _mlx_memory_api().clear_cache()
+    except Exception:
+        pass
+
+
+def _load_mflux_pipeline(quantize: int):
+    """Load the MFLUX Z-Image Turbo pipeline."""
+    from mflux.models.z_image.variants.turbo.z_image_turbo import ZImageTurbo
+
+    print(f"[Z-Image] Loading Z-Image Turbo with {quantize}-bit quantization...")
+
+    # Load the model with quantization
+    pipeline = ZImageTurbo(
+        quantize=quantize,
+    )
+
+    print(f"[Z-Image] Z-Image Turbo loaded successfully")
+    return pipeline
+
+
+def _generate_png(pipeline, **kwargs) -> bytes:
+    """Generate an image and return it encoded as PNG."""
+    # Generate image - returns a GeneratedImage object
+    result = pipeline.generate_image(**kwargs)
+
+    # Materialize any lazy MLX output, then release cached buffers
+    # so memory doesn't grow across resolutions
+    if hasattr(result.image, "dtype"):
+        import mlx.core as mx
+        mx.eval(result.image)
+    clear_mlx_cache()
+
+    buffer = io.BytesIO()
+    result.image.save(buffer, format="PNG", optimize=False, compress_level=PNG_COMPRESS_LEVEL)
+    return buffer.getvalue()
+
+
+def _worker_main(conn, quantize: int):
+    """Entry point of the worker process: load the pipeline, then serve requests."""
+    try:
+        configure_mlx_memory()
+        pipeline = _load_mflux_pipeline(quantize)
+    except Exception as e:
+        import traceback
+        traceback.print_exc()
+        conn.send(("error", str(e)))
+        return
+    conn.send(("ready", None))
+
+    while True:
+        try:
+            command, kwargs = conn.recv()
+        except EOFError:
+            return
+        if command == "stop":
+            return
+
+        try:
+            conn.send(("ok", _generate_png(pipeline, **kwargs)))
+        except Exception as e:
+            import traceback
+            traceback.print_exc()
+            conn.send(("error", str(e)))
+
+
+class WorkerDiedError(RuntimeError):
+    """The worker process exited while it was expected to be running."""
+
+
+class PipelineWorker:
+    """A model pipeline running in its own process.
+
+    MLX keeps Metal buffers in the process that allocated them, so running
+    each pipeline in a child process means unloading it returns all of its
+    memory to the OS.
+    """
+
+    def __init__(self, model_info: ModelView):
+        self.model_info = model_info
+        self._conn = None
+        self._process: Optional[multiprocessing.Process] = None
+        self._lock = threading.Lock()
+
+    def start(self):
+        """Start the worker process and block until the pipeline is loaded."""
+        ctx = multiprocessing.get_context("spawn")
+        self._conn, child_conn = ctx.Pipe()
+        self._process = ctx.Process(
+            target=_worker_main,
+            args=(child_conn, self.model_info.quantize),
+            daemon=True,
+        )
+        self._process.start()
+        child_conn.close()
+
+        status, error = self._receive()
+        if status != "ready":
+            self.stop()
+            raise RuntimeError(error)
+
+    def _receive(self):
+        try:
+            return self._conn.recv()
+        except (EOFError, OSError):
+            raise WorkerDiedError("Model worker process exited unexpectedly")
+
+    def generate(self, **kwargs) -> bytes:
+        """Generate an image in the worker process and return it as PNG bytes."""
+        with self._lock:
+            if self._process is None:
+                raise RuntimeError("Model worker has been stopped")
+            try:
+                self._conn.send(("generate", kwargs))
+            except (OSError, ValueError):
+                raise WorkerDiedError("Model worker process exited unexpectedly")
+            status, result = self._receive()
+        if status != "ok":
+            raise RuntimeError(result)
+        return result
+
+    def stop(self, timeout: float = 10.0):
+        """Stop the worker process, freeing all of its memory.
+
+        Waits for an in-flight generation to finish first.
+        """
+        with self._lock:
+            if self._process is None:
+                return
+            try:
+                self._conn.send(("stop", None))
+            except (OSError, ValueError):
+                pass
+            self._process.join(timeout)
+            if self._process.is_alive():
+                self._process.terminate()
+                self._process.join()
+            self._conn.close()
+            self._process = None
@@ -34,11 +34,23 @@ function ImageModal({ image, onClose }: ImageModalProps) {
     setTimeout(() => setCopied(false), 2000);
   };
 
-  const handleDownload = () => {
-    const link = document.createElement("a");
-    link.href = `data:image/png;base64,${image.image_base64}`;
-    link.download = `z-image-${image.image_id}.png`;
-    link.click();
+  const handleDownload = async () => {
+    // The image is served cross-origin, so download it through a blob URL
+    try {
+      const response = await fetch(api.getImageUrl(image.image_id));
+      if (!response.ok) {
+        throw new Error(`HTTP ${response.status}`);
+      }
+      const url = URL.createObjectURL(await response.blob());
+      const link = document.createElement("a");
+      link.href = url;
+      link.download = `z-image-${image.image_id}.png`;
+      link.click();
+      // Revoking right away can cancel the download in some browsers
+      setTimeout(() => URL.revokeObjectURL(url), 1000);
+    } catch (err) {
+      console.error("Failed to download image:", err);
+    }
   };
 
   return (
@@ -54,7 +66,7 @@ function ImageModal({ image, onClose }: ImageModalProps) {
           {/* Image */}
           <div className="flex-1 bg-zinc-900 flex items-center justify-center p-4">
             <img
-              src={`data:image/png;base64,${image.image_base64}`}
+              src={api.getImageUrl(image.image_id)}
               alt={image.prompt}
               className="max-w-full max-h-[70vh] object-contain rounded-lg"
             />
@@ -297,7 +309,7 @@ export function GeneratePage() {
                   onClick={() => setSelectedImage(image)}
                 >
                   <img
-                    src={`data:image/png;base64,${image.image_base64}`}
+                    src={api.getImageUrl(image.image_id)}
                     alt={image.prompt}
                     className="w-full h-full object-cover"
                   />
@@ -579,7 +591,7 @@ export function GeneratePage() {
               </div>
             ) : generatedImages.length > 0 ? (
               <img
-                src={`data:image/png;base64,${generatedImages[0].image_base64}`}
+                src={api.getImageUrl(generatedImages[0].image_id)}
                 alt={generatedImages[0].prompt}
                 className="w-full h-full object-contain cursor-pointer"
                 onClick={() => setSelectedImage(generatedImages[0])}
@@ -105,7 +105,8 @@ function ModelCard({ model, onDownload, onLoad }: ModelCardProps) {
           </div>
           <div className="flex justify-between text-xs text-zinc-500 mt-2">
             <span>
-              {progress.files_completed} / {progress.total_files} files
+              {progress.total_files > 0 &&
+                `${progress.files_completed} / ${progress.total_files} files`}
             </span>
             <span className="flex items-center gap-2">
               {progress.speed > 0 && <span>{formatSpeed(progress.speed)}</span>}
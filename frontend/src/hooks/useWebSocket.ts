@@ -1,5 +1,5 @@
 import { useEffect, useRef, useCallback, useState } from "react";
-import type { WebSocketMessage } from "../types";
+import type { WebSocketMessage, BatchMessage } from "../types";
 
 interface UseWebSocketOptions {
   onMessage?: (message: WebSocketMessage) => void;
@@ -8,6 +8,8 @@ interface UseWebSocketOptions {
   reconnectInterval?: number;
 }
 
+const textDecoder = new TextDecoder();
+
 export function useWebSocket(url: string, options: UseWebSocketOptions = {}) {
   const { reconnectInterval = 3000 } = options;
 
@@ -46,6 +48,7 @@ export function useWebSocket(url: string, options: UseWebSocketOptions = {}) {
     try {
       console.log("WebSocket connecting to:", url);
       const ws = new WebSocket(url);
+      ws.binaryType = "arraybuffer";
 
       ws.onopen = () => {
         if (!mountedRef.current) return;
@@ -79,8 +82,20 @@ export function useWebSocket(url: string, options: UseWebSocketOptions = {}) {
 
       ws.onmessage = (event) => {
         try {
-          const message = JSON.parse(event.data) as WebSocketMessage;
-          onMessageRef.current?.(message);
+          // Broadcasts arrive as pre-encoded binary frames
+          const text =
+            typeof event.data === "string"
+              ? event.data
+              : textDecoder.decode(event.data as ArrayBuffer);
+          const message = JSON.parse(text) as WebSocketMessage;
+          // The server coalesces queued updates into a single batch frame
+          if (message.type === "batch") {
+            for (const item of (message as BatchMessage).messages) {
+              onMessageRef.current?.(item);
+            }
+          } else {
+            onMessageRef.current?.(message);
+          }
         } catch (err) {
           console.error("Failed to parse WebSocket message:", err);
         }
@@ -52,6 +52,7 @@ export interface GenerationRequest {
   guidance_scale: number;
   seed?: number;
   negative_prompt?: string;
+  include_base64?: boolean;
 }
 
 export interface GeneratedImage {
@@ -78,6 +79,11 @@ export interface WebSocketMessage {
   [key: string]: unknown;
 }
 
+export interface BatchMessage extends WebSocketMessage {
+  type: "batch";
+  messages: WebSocketMessage[];
+}
+
 export interface ModelStatusMessage extends WebSocketMessage {
   type: "model_status";
   model_id: string;